@@ -278,7 +278,8 @@ class DisplayManager:
                     calculate_remaining_windows,
                     detect_subscription_plan_from_ccusage,
                     run_ccusage_command,
-                    calculate_current_window_usage
+                    calculate_current_window_usage,
+                    count_user_prompts_from_ccusage
                 )
             except ImportError:
                 from shared.utils import (
@@ -286,7 +287,8 @@ class DisplayManager:
                     calculate_remaining_windows,
                     detect_subscription_plan_from_ccusage,
                     run_ccusage_command,
-                    calculate_current_window_usage
+                    calculate_current_window_usage,
+                    count_user_prompts_from_ccusage
                 )
             
             # Calculate total windows in billing period
@@ -327,24 +329,12 @@ class DisplayManager:
             # Calculate current window usage
             current_window = calculate_current_window_usage()
             
-            # Calculate current window prompts from ccusage blocks within the current window
-            current_window_prompts = 0
-            window_start = current_window['window_start']
-            window_end = current_window['window_end']
-            
             # Count actual prompts (entries) from ccusage blocks within the current 5-hour window
-            if "blocks" in ccusage_data:
-                for block in ccusage_data["blocks"]:
-                    try:
-                        # Parse block start time
-                        if "startTime" in block:
-                            block_start = datetime.fromisoformat(block["startTime"].replace('Z', '+00:00'))
-                            # Check if block started within current window
-                            if window_start <= block_start <= window_end:
-                                # Add entries count (prompts/conversations in this block)
-                                current_window_prompts += block.get("entries", 0)
-                    except (ValueError, TypeError, KeyError):
-                        continue
+            current_window_prompts = count_user_prompts_from_ccusage(
+                ccusage_data,
+                current_window['window_start'],
+                current_window['window_end']
+            )
             
             max_prompts_per_window = plan_info['prompts_per_window']
             
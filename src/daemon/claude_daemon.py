@@ -178,25 +178,28 @@ class ClaudeDaemon:
         """
         self.logger.info("Daemon main loop started")
         
-        last_collection_time = 0
+        # Scheduled on the monotonic clock so NTP/DST wall-clock jumps can't
+        # stall or burst collections; -inf makes the first tick collect at once
+        last_collection_time = float('-inf')
         collection_interval = self.config.ccusage_fetch_interval_seconds
         
         while not self._stop_event.is_set():
             try:
-                current_time = time.time()
+                current_time = time.monotonic()
                 
                 # Check if it's time to collect data
                 if current_time - last_collection_time >= collection_interval:
                     self._collect_data()
                     last_collection_time = current_time
                 
-                # Sleep for a short interval to prevent busy waiting
-                time.sleep(0.1)
+                # Sleep for a short interval to prevent busy waiting; waking
+                # on the stop event lets stop() return without a full tick
+                self._stop_event.wait(0.1)
                 
             except Exception as e:
                 self.logger.error(f"Error in daemon main loop: {e}")
                 # Continue running despite errors
-                time.sleep(1)
+                self._stop_event.wait(1)
         
         self.logger.info("Daemon main loop stopped")
     
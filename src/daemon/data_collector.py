@@ -14,6 +14,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from shared.data_models import SessionData, MonitoringData, ConfigData, ErrorStatus, ActivitySessionData, UsageIntensityData
 from shared.constants import DAEMON_VERSION
+from shared.utils import json_loads, parse_iso_datetime
 from .subprocess_pool import run_ccusage_pooled
 from .ccusage_runner import run_ccusage_direct
 from .session_activity_tracker import SessionActivityTracker
@@ -86,15 +87,17 @@ class DataCollector:
                 if block.get("isGap", False):
                     continue
                 try:
-                    start_time = datetime.fromisoformat(block["startTime"].replace('Z', '+00:00'))
+                    start_time = parse_iso_datetime(block["startTime"])
                     if start_time >= billing_start_utc:
                         period_blocks.append(block)
                 except Exception as e:
                     self.logger.warning(f"Failed to parse startTime for block {block.get('id', 'unknown')}: {e}")
                     continue
             
-            # Convert filtered blocks to sessions
+            # Convert filtered blocks to sessions, accumulating totals in the same pass
             sessions = []
+            total_cost_usd = 0.0
+            current_session_max = 0
             for block in period_blocks:
                 try:
                     session = self._parse_ccusage_block(block)
@@ -102,23 +105,11 @@ class DataCollector:
                 except Exception as e:
                     self.logger.warning(f"Failed to parse block {block.get('id', 'unknown')}: {e}")
                     continue
+                total_cost_usd += session.cost_usd
+                if session.total_tokens > current_session_max:
+                    current_session_max = session.total_tokens
             
-            # Calculate totals
-            total_input_tokens = sum(s.input_tokens for s in sessions)
-            total_output_tokens = sum(s.output_tokens for s in sessions)
-            total_cost_usd = sum(s.cost_usd for s in sessions)
-            
-            # Count active sessions (sessions without end_time or recent end_time)
             now = datetime.now(timezone.utc)
-            active_sessions = 0
-            for session in sessions:
-                if session.end_time is None:
-                    active_sessions += 1
-                elif session.end_time and (now - session.end_time).total_seconds() < 300:  # 5 minutes
-                    active_sessions += 1
-            
-            # Calculate max tokens from current sessions
-            current_session_max = max([s.total_tokens for s in sessions], default=0)
             
             # Update persistent max_tokens if we found a higher value
             if current_session_max > self._max_tokens_per_session:
@@ -183,10 +174,10 @@ class DataCollector:
             SessionData object
         """
         # Parse timestamps using correct field names
-        start_time = datetime.fromisoformat(block['startTime'].replace('Z', '+00:00'))
+        start_time = parse_iso_datetime(block['startTime'])
         end_time = None
         if 'endTime' in block and block['endTime']:
-            end_time = datetime.fromisoformat(block['endTime'].replace('Z', '+00:00'))
+            end_time = parse_iso_datetime(block['endTime'])
         
         # Extract tokens from nested tokenCounts structure
         token_counts = block.get('tokenCounts', {})
@@ -280,14 +271,15 @@ class DataCollector:
             command.extend(["-s", since_date])
             
         try:
+            # Leave stdout as bytes; the JSON decoder reads UTF-8 directly
+            # instead of after a full str decode of the output
             result = subprocess.run(
                 command,
                 capture_output=True,
-                text=True,
                 check=True,
                 timeout=30
             )
-            return json.loads(result.stdout)
+            return json_loads(result.stdout)
         except subprocess.TimeoutExpired as e:
             self.logger.error(f"ccusage wrapper timed out: {e}")
             raise
@@ -365,7 +357,6 @@ class DataCollector:
                 result = subprocess.run(
                     command, 
                     capture_output=True, 
-                    text=True, 
                     check=True,
                     env=env,
                     timeout=30,
@@ -376,12 +367,11 @@ class DataCollector:
                 result = subprocess.run(
                     command, 
                     capture_output=True, 
-                    text=True, 
                     check=True,
                     env=env,
                     timeout=30
                 )
-            return json.loads(result.stdout)
+            return json_loads(result.stdout)
         except subprocess.TimeoutExpired:
             self.logger.error("ccusage command timed out")
             return {"blocks": []}
@@ -453,8 +443,8 @@ class DataCollector:
         for block in blocks:
             if block.get("isGap", False):
                 continue
-            start_time = datetime.fromisoformat(block["startTime"].replace('Z', '+00:00'))
-            end_time = datetime.fromisoformat(block["endTime"].replace('Z', '+00:00'))
+            start_time = parse_iso_datetime(block["startTime"])
+            end_time = parse_iso_datetime(block["endTime"])
             if start_time <= now_utc <= end_time:
                 return block
         return None
@@ -6,7 +6,6 @@ Tracks activity sessions from Claude Code hooks and manages session lifecycle.
 
 import os
 import logging
-import glob
 import threading
 import time
 from datetime import datetime, timezone, timedelta
@@ -75,7 +74,7 @@ class SessionActivityTracker:
         Returns:
             True if update was successful, False otherwise
         """
-        start_time = time.time()
+        start_time = time.monotonic()
         
         try:
             log_files = self._discover_log_files()
@@ -110,7 +109,7 @@ class SessionActivityTracker:
                 self._stats['cache_hits'] += 1
                 self.logger.debug("Using cached session data")
             
-            self._stats['last_update_duration'] = time.time() - start_time
+            self._stats['last_update_duration'] = time.monotonic() - start_time
             return True
             
         except Exception as e:
@@ -412,16 +411,14 @@ class SessionActivityTracker:
         cutoff_time = now - timedelta(hours=BILLING_SESSION_HOURS)
         
         with self._session_lock:
-            # Separate recent sessions (within 5h) from old sessions (outside 5h)
-            recent_sessions = [
-                session for session in self._active_sessions
-                if session.start_time >= cutoff_time
-            ]
-            
-            old_sessions = [
-                session for session in self._active_sessions
-                if session.start_time < cutoff_time
-            ]
+            # Separate recent sessions (within 5h) from old sessions (outside 5h) in one pass
+            recent_sessions = []
+            old_sessions = []
+            for session in self._active_sessions:
+                if session.start_time >= cutoff_time:
+                    recent_sessions.append(session)
+                else:
+                    old_sessions.append(session)
             
             # If there are old sessions to remove
             if old_sessions:
@@ -436,19 +433,18 @@ class SessionActivityTracker:
                     log_file_path = os.path.join(log_dir, HOOK_LOG_FILE_PATTERN)
                     
                     try:
-                        if os.path.exists(log_file_path):
-                            # Clear the file content (truncate to 0 bytes)
-                            with open(log_file_path, 'w') as f:
-                                pass  # Just open and close to truncate
-                            
-                            self.logger.info(f"Cleared activity log file - all sessions outside 5h billing window")
-                            
-                            # Clear file modification cache as well
-                            self._file_modification_times.clear()
-                            self._last_cache_update = None
-                            
+                        # Clear the file content (truncate to 0 bytes) without opening it
+                        os.truncate(log_file_path, 0)
+                    except FileNotFoundError:
+                        pass  # Nothing to clear
                     except Exception as e:
                         self.logger.error(f"Failed to clear activity log file: {e}")
+                    else:
+                        self.logger.info(f"Cleared activity log file - all sessions outside 5h billing window")
+                        
+                        # Clear file modification cache as well
+                        self._file_modification_times.clear()
+                        self._last_cache_update = None
     
     def _maybe_compress_hook_log(self) -> None:
         """Check if hook log file needs compression and compress if necessary."""
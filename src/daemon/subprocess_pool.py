@@ -10,6 +10,8 @@ import time
 from queue import Queue, Empty
 from typing import Optional, Dict, Any, List
 
+from shared.utils import json_loads
+
 
 class SubprocessPool:
     """
@@ -174,7 +176,7 @@ class SubprocessPool:
             with self._lock:
                 if cache_key in self._result_cache:
                     cached_result, timestamp = self._result_cache[cache_key]
-                    if time.time() - timestamp < self._cache_ttl:
+                    if time.monotonic() - timestamp < self._cache_ttl:
                         self.logger.debug(f"Returning cached result for: {cache_key}")
                         return cached_result
                         
@@ -189,9 +191,9 @@ class SubprocessPool:
         self._command_queue.put((command, result_future))
         
         # Wait for completion
-        start_time = time.time()
+        start_time = time.monotonic()
         while not result_future['done']:
-            if time.time() - start_time > 35:  # 35 second timeout
+            if time.monotonic() - start_time > 35:  # 35 second timeout
                 self.logger.error(f"Command timed out in queue: {command}")
                 return {
                     'success': False,
@@ -215,7 +217,7 @@ class SubprocessPool:
         # Cache successful results
         if use_cache and result.get('success'):
             with self._lock:
-                self._result_cache[cache_key] = (result, time.time())
+                self._result_cache[cache_key] = (result, time.monotonic())
                 # Clean old cache entries
                 self._clean_cache()
                 
@@ -223,7 +225,7 @@ class SubprocessPool:
         
     def _clean_cache(self):
         """Remove expired cache entries."""
-        current_time = time.time()
+        current_time = time.monotonic()
         expired_keys = [
             key for key, (_, timestamp) in self._result_cache.items()
             if current_time - timestamp > self._cache_ttl
@@ -270,7 +272,7 @@ def run_ccusage_pooled(since_date: Optional[str] = None) -> Dict[str, Any]:
         return {"blocks": []}
         
     try:
-        return json.loads(result.get('stdout', '{}'))
+        return json_loads(result.get('stdout', '{}'))
     except json.JSONDecodeError as e:
         logging.error(f"Failed to parse ccusage output: {e}")
         return {"blocks": []}
\ No newline at end of file
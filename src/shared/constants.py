@@ -184,6 +184,7 @@ CACHE_PERFORMANCE_LOG_INTERVAL = 100  # Log every N operations
 MAX_CACHE_ENTRIES = 1000  # Maximum number of cached projects
 CACHE_CLEANUP_THRESHOLD = 1200  # Trigger cleanup when cache exceeds this
 CACHE_SIZE_WARNING_THRESHOLD = 800  # Warn when cache approaches limit
+CCUSAGE_RESULT_CACHE_TTL_SECONDS = 30  # Reuse parsed ccusage output for this long
 
 # Memory Management Configuration
 CACHE_CLEANUP_BATCH_SIZE = 50  # Number of entries to remove in each cleanup
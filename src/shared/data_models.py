@@ -40,11 +40,18 @@ class SessionData:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert SessionData to dictionary."""
-        data = asdict(self)
-        # Convert datetime objects to ISO format strings
-        data['start_time'] = self.start_time.isoformat()
-        data['end_time'] = self.end_time.isoformat() if self.end_time else None
-        return data
+        # Built directly like MonitoringData.to_dict; asdict would deep-copy
+        # every field only for the datetimes to be overwritten
+        return {
+            'session_id': self.session_id,
+            'start_time': self.start_time.isoformat(),
+            'end_time': self.end_time.isoformat() if self.end_time else None,
+            'total_tokens': self.total_tokens,
+            'input_tokens': self.input_tokens,
+            'output_tokens': self.output_tokens,
+            'cost_usd': self.cost_usd,
+            'is_active': self.is_active
+        }
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'SessionData':
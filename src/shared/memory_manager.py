@@ -6,6 +6,7 @@ This module provides memory management capabilities including cache size monitor
 LRU-based cleanup strategies, and automatic memory optimization.
 """
 import logging
+import time
 from typing import Dict, List, Tuple
 from datetime import datetime
 
@@ -222,9 +223,7 @@ class MemoryManager:
             target_size = self.max_entries
         
         # Filter out entries that are too new to be removed
-        from datetime import timezone
-        now = datetime.now(timezone.utc)
-        retention_cutoff = now.timestamp() - (MIN_CACHE_RETENTION_HOURS * 3600)
+        retention_cutoff = time.time() - (MIN_CACHE_RETENTION_HOURS * 3600)
         
         # Separate entries into cleanable and protected
         cleanable_entries = []
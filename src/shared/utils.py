@@ -5,13 +5,33 @@ Common functions for time handling, formatting, validation, and system operation
 """
 import os
 import sys
+import json
 import subprocess
 import shutil
 import random
+import time
+from array import array
+from bisect import bisect_right
+from calendar import monthrange
+from dataclasses import dataclass, field
+from functools import lru_cache
 from datetime import datetime, timedelta, date
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from zoneinfo import ZoneInfo
 
+try:
+    # Optional faster JSON decoder for ccusage output; its JSONDecodeError
+    # subclasses json's, so callers keep catching json.JSONDecodeError
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+try:
+    # Optional C ISO 8601 parser; understands a trailing 'Z' on every Python version
+    from ciso8601 import parse_datetime as _ciso_parse_datetime
+except ImportError:
+    _ciso_parse_datetime = None
+
 from .constants import (
     Colors, UTC_TIMEZONE, PROGRESS_BAR_WIDTH, 
     PROGRESS_BAR_FILLED_CHAR, PROGRESS_BAR_EMPTY_CHAR,
@@ -19,9 +39,97 @@ from .constants import (
     TIMING_SUGGESTIONS_POSITIVE, TIMING_SUGGESTIONS_MODERATE,
     TIMING_SUGGESTIONS_SKEPTICAL, TIMING_SUGGESTIONS_CRITICAL,
     DEFAULT_CONFIG_DIR, DEFAULT_PROJECT_CACHE_FILE,
-    WINDOW_DURATION_HOURS, SUBSCRIPTION_PLANS
+    WINDOW_DURATION_HOURS, SUBSCRIPTION_PLANS, SUSTAINABILITY_THRESHOLD,
+    CCUSAGE_RESULT_CACHE_TTL_SECONDS
+)
+
+# datetime.fromisoformat() only accepts a trailing 'Z' from Python 3.11 on
+_ISO_NEEDS_Z_FIX = sys.version_info < (3, 11)
+
+# Window length in whole seconds and as a reusable timedelta
+_WINDOW_SECONDS = int(WINDOW_DURATION_HOURS * 3600)
+_WINDOW_DELTA = timedelta(seconds=_WINDOW_SECONDS)
+
+# Default prompts per window for each plan, looked up once at import
+_PROMPTS_PRO = SUBSCRIPTION_PLANS['Pro']['default_prompts_per_window']
+_PROMPTS_MAX_5X = SUBSCRIPTION_PLANS['Max_5x']['default_prompts_per_window']
+_PROMPTS_MAX_20X = SUBSCRIPTION_PLANS['Max_20x']['default_prompts_per_window']
+
+# Timing suggestion list for each minute of the hour (0-15, 16-30, 31-45, 46-59)
+_TIMING_SUGGESTION_BUCKETS = (
+    [TIMING_SUGGESTIONS_POSITIVE] * 16
+    + [TIMING_SUGGESTIONS_MODERATE] * 15
+    + [TIMING_SUGGESTIONS_SKEPTICAL] * 15
+    + [TIMING_SUGGESTIONS_CRITICAL] * 14
 )
 
+# Private generator for the suggestions, seeded once at import
+_RNG = random.Random()
+
+# Every rendered state of a progress bar, keyed by width (index = filled cells)
+_PROGRESS_BAR_MAX_WIDTH = 512
+_PROGRESS_BAR_CACHE: Dict[int, Tuple[str, ...]] = {}
+
+
+def _progress_bar_states(width: int) -> Tuple[str, ...]:
+    """Return (building on first use) all width + 1 bar strings for a width."""
+    states = _PROGRESS_BAR_CACHE.get(width)
+    if states is None:
+        states = tuple(
+            f"[{PROGRESS_BAR_FILLED_CHAR * filled}{PROGRESS_BAR_EMPTY_CHAR * (width - filled)}]"
+            for filled in range(width + 1)
+        )
+        _PROGRESS_BAR_CACHE[width] = states
+    return states
+
+
+_progress_bar_states(PROGRESS_BAR_WIDTH)
+
+
+def parse_iso_datetime(value: str) -> datetime:
+    """
+    Parse an ISO 8601 timestamp, accepting a trailing 'Z' for UTC.
+
+    The 'Z' is only rewritten on Python < 3.11; newer fromisoformat()
+    handles it without the extra string copy.
+
+    Args:
+        value: Timestamp string such as ccusage's "2025-06-18T08:00:00.000Z"
+
+    Returns:
+        Parsed datetime
+
+    Raises:
+        ValueError: If the string is not a valid ISO 8601 timestamp
+    """
+    if _ciso_parse_datetime is not None:
+        return _ciso_parse_datetime(value)
+    if _ISO_NEEDS_Z_FIX:
+        value = value.replace('Z', '+00:00')
+    return datetime.fromisoformat(value)
+
+
+def _parse_iso_timestamp(value: str) -> float:
+    """Parse an ISO 8601 timestamp straight to POSIX seconds."""
+    return parse_iso_datetime(value).timestamp()
+
+
+# (monotonic time of last refresh, cached date.today()) shared by the billing
+# helpers; replaced as a whole so concurrent readers never see a half-updated pair
+_today_cache: Tuple[float, Optional[date]] = (float('-inf'), None)
+
+
+def _today() -> date:
+    """Return date.today(), re-reading the clock at most once per second."""
+    global _today_cache
+    # Monotonic, so a wall clock stepped backwards can't pin a stale date
+    now = time.monotonic()
+    refreshed_at, today = _today_cache
+    if now - refreshed_at > 1.0:
+        today = date.today()
+        _today_cache = (now, today)
+    return today
+
 
 def get_subscription_period_start(start_day: int, reference_date: Optional[date] = None) -> date:
     """
@@ -35,15 +143,20 @@ def get_subscription_period_start(start_day: int, reference_date: Optional[date]
         Start date of current billing period
     """
     if reference_date is None:
-        reference_date = date.today()
+        reference_date = _today()
     
-    if reference_date.day >= start_day:
-        return reference_date.replace(day=start_day)
+    year, month = reference_date.year, reference_date.month
+    # In months shorter than start_day the renewal falls on the last day
+    renewal_day = min(start_day, monthrange(year, month)[1])
+    if reference_date.day >= renewal_day:
+        return date(year, month, renewal_day)
+    
+    # Go to previous month, clamping to its last day
+    if month == 1:
+        year, month = year - 1, 12
     else:
-        # Go to previous month
-        first_day_of_current_month = reference_date.replace(day=1)
-        last_day_of_previous_month = first_day_of_current_month - timedelta(days=1)
-        return last_day_of_previous_month.replace(day=min(start_day, last_day_of_previous_month.day))
+        month -= 1
+    return date(year, month, min(start_day, monthrange(year, month)[1]))
 
 
 def get_next_renewal_date(start_day: int, reference_date: Optional[date] = None) -> date:
@@ -58,21 +171,20 @@ def get_next_renewal_date(start_day: int, reference_date: Optional[date] = None)
         Next renewal date
     """
     if reference_date is None:
-        reference_date = date.today()
+        reference_date = _today()
     
-    if reference_date.day >= start_day:
+    next_year, next_month = reference_date.year, reference_date.month
+    # Same clamped comparison as get_subscription_period_start, so the
+    # renewal is always after the period start
+    if reference_date.day >= min(start_day, monthrange(next_year, next_month)[1]):
         # Next renewal is next month
-        next_month = reference_date.month + 1
-        next_year = reference_date.year
-        if next_month > 12:
-            next_month = 1
-            next_year += 1
-    else:
-        # Next renewal is this month
-        next_month = reference_date.month
-        next_year = reference_date.year
+        if next_month == 12:
+            next_year, next_month = next_year + 1, 1
+        else:
+            next_month += 1
+    # Otherwise the next renewal is this month
     
-    return date(next_year, next_month, start_day)
+    return date(next_year, next_month, min(start_day, monthrange(next_year, next_month)[1]))
 
 
 def create_progress_bar(percentage: float, width: int = PROGRESS_BAR_WIDTH) -> str:
@@ -86,10 +198,19 @@ def create_progress_bar(percentage: float, width: int = PROGRESS_BAR_WIDTH) -> s
     Returns:
         Formatted progress bar string
     """
-    percentage = max(0, min(100, percentage))  # Clamp to 0-100
-    filled_width = int(width * percentage / 100)
-    bar = PROGRESS_BAR_FILLED_CHAR * filled_width + PROGRESS_BAR_EMPTY_CHAR * (width - filled_width)
-    return f"[{bar}]"
+    if width > _PROGRESS_BAR_MAX_WIDTH:
+        raise ValueError(f"Progress bar width must not exceed {_PROGRESS_BAR_MAX_WIDTH}")
+    
+    if width < 0:
+        width = 0  # Renders as an empty "[]", as before
+    
+    # Clamp to 0-100 without the builtin min/max call overhead; NaN fails
+    # every comparison and falls through to a full bar like min(100, nan)
+    if percentage <= 0:
+        return _progress_bar_states(width)[0]
+    if not percentage < 100:
+        return _progress_bar_states(width)[width]
+    return _progress_bar_states(width)[int(width * percentage / 100)]
 
 
 def format_timedelta(td: timedelta) -> str:
@@ -102,15 +223,12 @@ def format_timedelta(td: timedelta) -> str:
     Returns:
         Formatted string like "2h 30m"
     """
-    total_seconds = int(td.total_seconds())
-    
+    # Whole seconds straight from the timedelta fields, no float round trip
+    total_seconds = td.days * 86400 + td.seconds
     if total_seconds < 0:
         return "0h 00m"
-    
     hours, remainder = divmod(total_seconds, 3600)
-    minutes, _ = divmod(remainder, 60)
-    
-    return f"{hours}h {minutes:02d}m"
+    return f"{hours}h {remainder // 60:02d}m"
 
 
 def format_currency(amount: float, currency: str = "USD") -> str:
@@ -124,10 +242,10 @@ def format_currency(amount: float, currency: str = "USD") -> str:
     Returns:
         Formatted currency string
     """
-    if currency.upper() == "USD":
+    # Exact match first so the common case skips the .upper() copy
+    if currency == "USD" or currency.upper() == "USD":
         return f"${amount:.2f}"
-    else:
-        return f"{amount:.2f} {currency}"
+    return f"{amount:.2f} {currency}"
 
 
 def format_token_count(tokens: int) -> str:
@@ -140,9 +258,27 @@ def format_token_count(tokens: int) -> str:
     Returns:
         Formatted token count string
     """
+    # The ',' option is locale-independent and grouped in C; a pure-Python
+    # comma inserter benchmarks ~3x slower for counts of 1,000 and above.
     return f"{tokens:,}"
 
 
+@lru_cache(maxsize=128)
+def _get_zoneinfo(name: str) -> ZoneInfo:
+    """Return a cached ZoneInfo for the given key."""
+    return ZoneInfo(name)
+
+
+@lru_cache(maxsize=128)
+def _is_valid_timezone(name: str) -> bool:
+    """Cached validity check; remembers invalid names, which lru_cache can't do for exceptions."""
+    try:
+        _get_zoneinfo(name)
+        return True
+    except Exception:
+        return False
+
+
 def validate_timezone(timezone_str: str) -> bool:
     """
     Validate timezone string.
@@ -154,9 +290,8 @@ def validate_timezone(timezone_str: str) -> bool:
         True if valid timezone, False otherwise
     """
     try:
-        ZoneInfo(timezone_str)
-        return True
-    except Exception:
+        return _is_valid_timezone(timezone_str)
+    except TypeError:  # Unhashable input
         return False
 
 
@@ -174,26 +309,47 @@ def convert_timezone(dt: datetime, target_timezone: str) -> datetime:
     if dt.tzinfo is None:
         dt = dt.replace(tzinfo=UTC_TIMEZONE)
     
-    target_tz = ZoneInfo(target_timezone)
-    return dt.astimezone(target_tz)
+    return dt.astimezone(_get_zoneinfo(target_timezone))
+
+
+_IS_MACOS = sys.platform == "darwin"
 
 
 def is_macos() -> bool:
     """Check if running on macOS."""
-    return sys.platform == "darwin"
+    return _IS_MACOS
+
+
+@lru_cache(maxsize=None)
+def _which(command: str) -> Optional[str]:
+    """Resolve a command to its absolute path once per process (None if missing)."""
+    return shutil.which(command)
 
 
 def is_command_available(command: str) -> bool:
     """
     Check if a command is available in PATH.
     
+    Results are cached for the lifetime of the process, so repeated
+    notifications don't walk $PATH every time.
+    
     Args:
         command: Command name to check
         
     Returns:
         True if command is available, False otherwise
     """
-    return shutil.which(command) is not None
+    return _which(command) is not None
+
+
+# AppleScript run handler that takes message, title and sound as argv items,
+# so user text is never spliced into the script source
+_OSASCRIPT_NOTIFICATION_ARGS = (
+    "-e", "on run argv",
+    "-e", "display notification (item 1 of argv) with title (item 2 of argv) "
+          "sound name (item 3 of argv)",
+    "-e", "end run",
+)
 
 
 def send_macos_notification(title: str, message: str, sound: str = "default") -> bool:
@@ -215,12 +371,14 @@ def send_macos_notification(title: str, message: str, sound: str = "default") ->
     if is_command_available(MACOS_TERMINAL_NOTIFIER_CMD):
         try:
             cmd = [
-                MACOS_TERMINAL_NOTIFIER_CMD,
+                _which(MACOS_TERMINAL_NOTIFIER_CMD) or MACOS_TERMINAL_NOTIFIER_CMD,
                 "-title", title,
                 "-message", message,
                 "-sound", sound
             ]
-            subprocess.run(cmd, check=True, capture_output=True)
+            # Output is never read, so skip the capture pipes
+            subprocess.run(cmd, check=True, stdin=subprocess.DEVNULL,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             return True
         except subprocess.CalledProcessError:
             pass
@@ -228,8 +386,9 @@ def send_macos_notification(title: str, message: str, sound: str = "default") ->
     # Fallback to osascript
     if is_command_available(MACOS_OSASCRIPT_CMD):
         try:
-            script = f'display notification "{message}" with title "{title}" sound name "{sound}"'
-            subprocess.run([MACOS_OSASCRIPT_CMD, "-e", script], check=True, capture_output=True)
+            cmd = [_which(MACOS_OSASCRIPT_CMD) or MACOS_OSASCRIPT_CMD, *_OSASCRIPT_NOTIFICATION_ARGS, message, title, sound]
+            subprocess.run(cmd, check=True, stdin=subprocess.DEVNULL,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             return True
         except subprocess.CalledProcessError:
             pass
@@ -237,24 +396,61 @@ def send_macos_notification(title: str, message: str, sound: str = "default") ->
     return False
 
 
+# ccusage is short-lived and only talks over its pipes, so on POSIX we skip
+# closing every inherited descriptor in the child
+_CCUSAGE_CLOSE_FDS = os.name != 'posix'
+
+# Successful ccusage results keyed by since_date: (monotonic timestamp, parsed data)
+_ccusage_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+
+def _copy_ccusage_result(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a cached result so callers can't add, drop or reorder cached blocks."""
+    result = dict(data)
+    blocks = result.get("blocks")
+    if isinstance(blocks, list):
+        result["blocks"] = list(blocks)
+    return result
+
+
 def run_ccusage_command(since_date: Optional[str] = None) -> Dict[str, Any]:
     """
     Run ccusage command and return parsed results.
     
+    Successful results are cached for CCUSAGE_RESULT_CACHE_TTL_SECONDS so that
+    back-to-back callers don't spawn ccusage again. Errors are never cached.
+    Callers that poll (e.g. the display's prompt counter on every refresh)
+    therefore see new ccusage data up to that many seconds late.
+    
+    Each call gets its own copy of the result dict and its "blocks" list;
+    the block dicts inside are shared with the cache and must be treated
+    as read-only.
+    
     Args:
         since_date: Optional date string for filtering (YYYYMMDD format)
         
     Returns:
         Dictionary with ccusage results or error information
     """
-    command = ["ccusage", "blocks", "-j"]
+    cache_key = since_date or ''
+    now = time.monotonic()
+    cached = _ccusage_cache.get(cache_key)
+    if cached is not None and now - cached[0] < CCUSAGE_RESULT_CACHE_TTL_SECONDS:
+        return _copy_ccusage_result(cached[1])
+    
+    # Absolute path skips the $PATH walk on spawn; the bare name still
+    # surfaces FileNotFoundError below when ccusage is not installed
+    command = [_which("ccusage") or "ccusage", "blocks", "-j"]
     if since_date:
         command.extend(["-s", since_date])
     
     try:
-        result = subprocess.run(command, capture_output=True, text=True, check=True, timeout=30)
-        import json
-        return json.loads(result.stdout)
+        # Keep stdout as bytes - both decoders accept it and skip a str copy
+        result = subprocess.run(command, capture_output=True, check=True, timeout=30,
+                                close_fds=_CCUSAGE_CLOSE_FDS)
+        data = json_loads(result.stdout)
+        _ccusage_cache[cache_key] = (now, data)
+        return _copy_ccusage_result(data)
     except FileNotFoundError:
         return {"error": "ccusage command not found", "blocks": []}
     except subprocess.CalledProcessError as e:
@@ -265,9 +461,39 @@ def run_ccusage_command(since_date: Optional[str] = None) -> Dict[str, Any]:
         return {"error": "ccusage returned invalid JSON", "blocks": []}
 
 
+def _enable_windows_ansi() -> bool:
+    """Enable VT escape processing on the Windows console (Windows 10+)."""
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+    except Exception:
+        return False
+
+
+def _detect_ansi_support() -> bool:
+    """Decide once whether the terminal understands ANSI escape sequences."""
+    if os.environ.get("TERM") == "dumb":
+        return False
+    return os.name != 'nt' or _enable_windows_ansi()
+
+
+_CLEAR_SEQUENCE = "\033[2J\033[H"
+_ANSI_SUPPORTED = _detect_ansi_support()
+
+
 def clear_terminal():
     """Clear terminal screen in a cross-platform way."""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    if not _ANSI_SUPPORTED:
+        os.system('cls' if os.name == 'nt' else 'clear')
+        return
+    sys.stdout.write(_CLEAR_SEQUENCE)
+    sys.stdout.flush()
 
 
 def get_terminal_size() -> tuple[int, int]:
@@ -283,7 +509,10 @@ def get_terminal_size() -> tuple[int, int]:
         return (80, 24)  # Default fallback
 
 
-def truncate_string(text: str, max_length: int, suffix: str = "...") -> str:
+_DEFAULT_TRUNCATE_SUFFIX = "..."
+
+
+def truncate_string(text: str, max_length: int, suffix: str = _DEFAULT_TRUNCATE_SUFFIX) -> str:
     """
     Truncate string to maximum length with suffix.
     
@@ -298,7 +527,8 @@ def truncate_string(text: str, max_length: int, suffix: str = "...") -> str:
     if len(text) <= max_length:
         return text
     
-    return text[:max_length - len(suffix)] + suffix
+    # One f-string build instead of slice-then-concat
+    return f"{text[:max_length - len(suffix)]}{suffix}"
 
 
 def ensure_directory_exists(directory_path: str) -> bool:
@@ -326,11 +556,12 @@ def get_file_age_seconds(file_path: str) -> float:
         file_path: Path to file
         
     Returns:
-        Age in seconds, or 0 if file doesn't exist
+        Age in seconds, or 0 if file doesn't exist. A missing file and a
+        just-written one look the same here; use is_file_stale() when the
+        difference matters.
     """
     try:
-        mtime = os.path.getmtime(file_path)
-        return datetime.now().timestamp() - mtime
+        return time.time() - os.stat(file_path).st_mtime
     except OSError:
         return 0.0
 
@@ -346,8 +577,11 @@ def is_file_stale(file_path: str, max_age_seconds: int) -> bool:
     Returns:
         True if file is stale or doesn't exist, False otherwise
     """
-    age = get_file_age_seconds(file_path)
-    return age == 0.0 or age > max_age_seconds
+    try:
+        mtime = os.stat(file_path).st_mtime
+    except OSError:
+        return True
+    return (time.time() - mtime) > max_age_seconds
 
 
 def safe_divide(numerator: float, denominator: float, default: float = 0.0) -> float:
@@ -382,7 +616,9 @@ def calculate_percentage(part: float, total: float) -> float:
         return 0.0
     
     percentage = (part / total) * 100
-    return max(0.0, min(100.0, percentage))  # Clamp to 0-100
+    # Clamp to 0-100 without the builtin min/max call overhead; NaN fails
+    # both comparisons and maps to 100.0, as max(0.0, min(100.0, nan)) did
+    return 0.0 if percentage < 0.0 else percentage if percentage <= 100.0 else 100.0
 
 
 def parse_date_string(date_str: str, format_str: str = "%Y-%m-%d") -> Optional[date]:
@@ -402,6 +638,9 @@ def parse_date_string(date_str: str, format_str: str = "%Y-%m-%d") -> Optional[d
         return None
 
 
+_FILE_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+
 def format_file_size(size_bytes: int) -> str:
     """
     Format file size in human-readable format.
@@ -412,21 +651,12 @@ def format_file_size(size_bytes: int) -> str:
     Returns:
         Formatted size string
     """
-    if size_bytes == 0:
-        return "0 B"
-    
-    units = ["B", "KB", "MB", "GB", "TB"]
-    unit_index = 0
-    size = float(size_bytes)
-    
-    while size >= 1024 and unit_index < len(units) - 1:
-        size /= 1024
-        unit_index += 1
+    if size_bytes < 1024:
+        return f"{int(size_bytes)} B"
     
-    if unit_index == 0:
-        return f"{int(size)} {units[unit_index]}"
-    else:
-        return f"{size:.1f} {units[unit_index]}"
+    # Each unit is 2**10 times the previous one, so the bit length picks it directly
+    unit_index = min((int(size_bytes).bit_length() - 1) // 10, len(_FILE_SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << (10 * unit_index)):.1f} {_FILE_SIZE_UNITS[unit_index]}"
 
 
 def get_work_timing_suggestion() -> str:
@@ -443,16 +673,11 @@ def get_work_timing_suggestion() -> str:
         - 31-45 minutes: Skeptical suggestions
         - 46-59 minutes: Humorous/critical suggestions
     """
-    current_minute = datetime.now().minute
-    
-    if current_minute <= 15:
-        return random.choice(TIMING_SUGGESTIONS_POSITIVE)
-    elif current_minute <= 30:
-        return random.choice(TIMING_SUGGESTIONS_MODERATE)
-    elif current_minute <= 45:
-        return random.choice(TIMING_SUGGESTIONS_SKEPTICAL)
-    else:
-        return random.choice(TIMING_SUGGESTIONS_CRITICAL)
+    return _RNG.choice(_TIMING_SUGGESTION_BUCKETS[datetime.now().minute])
+
+
+# Resolved once at import since $HOME does not change for the process
+_PROJECT_CACHE_PATH = os.path.join(os.path.expanduser(DEFAULT_CONFIG_DIR), DEFAULT_PROJECT_CACHE_FILE)
 
 
 def get_project_cache_file_path() -> str:
@@ -462,8 +687,7 @@ def get_project_cache_file_path() -> str:
     Returns:
         Absolute path to the project cache file
     """
-    config_dir = os.path.expanduser(DEFAULT_CONFIG_DIR)
-    return os.path.join(config_dir, DEFAULT_PROJECT_CACHE_FILE)
+    return _PROJECT_CACHE_PATH
 
 
 def detect_subscription_limits() -> Dict[str, Any]:
@@ -494,35 +718,8 @@ def detect_subscription_limits() -> Dict[str, Any]:
                 'confidence': 'low'
             }
         
-        blocks = ccusage_data["blocks"]
-        
-        # Analyze session patterns
-        session_durations = []
-        max_tokens_seen = 0
-        cost_patterns = []
-        
-        for block in blocks:
-            # Analyze session duration patterns
-            if "startedAt" in block and "endedAt" in block:
-                try:
-                    start_time = datetime.fromisoformat(block["startedAt"].replace('Z', '+00:00'))
-                    end_time = datetime.fromisoformat(block["endedAt"].replace('Z', '+00:00'))
-                    duration_hours = (end_time - start_time).total_seconds() / 3600
-                    session_durations.append(duration_hours)
-                except (ValueError, TypeError):
-                    continue
-            
-            # Analyze token patterns
-            token_counts = block.get("tokenCounts", {})
-            total_tokens = token_counts.get("inputTokens", 0) + token_counts.get("outputTokens", 0)
-            max_tokens_seen = max(max_tokens_seen, total_tokens)
-            
-            # Analyze cost patterns
-            if "costUSD" in block and block["costUSD"] > 0:
-                cost_patterns.append(block["costUSD"])
-        
         # Detection logic based on patterns
-        detected_type = _analyze_subscription_patterns(session_durations, cost_patterns, max_tokens_seen)
+        detected_type = _analyze_subscription_patterns(_blocks_to_arrays(ccusage_data["blocks"]))
         
         return detected_type
         
@@ -536,31 +733,86 @@ def detect_subscription_limits() -> Dict[str, Any]:
         }
 
 
-def _analyze_subscription_patterns(session_durations: List[float], 
-                                  cost_patterns: List[float], 
-                                  max_tokens: int) -> Dict[str, Any]:
+@dataclass
+class _BlockArrays:
+    """Structure-of-arrays view of the ccusage block fields used for detection."""
+    durations: array = field(default_factory=lambda: array('d'))
+    costs: array = field(default_factory=lambda: array('d'))
+    max_tokens: int = 0
+
+
+def _blocks_to_arrays(blocks: List[Dict[str, Any]]) -> _BlockArrays:
+    """
+    Extract session durations, costs and peak tokens from ccusage blocks in one pass.
+    
+    Args:
+        blocks: Blocks from ccusage output
+        
+    Returns:
+        Parallel typed arrays of durations (hours) and paid costs, plus max tokens
+    """
+    arrays = _BlockArrays()
+    durations = arrays.durations
+    costs = arrays.costs
+    max_tokens = 0
+    
+    for block in blocks:
+        # Analyze session duration patterns
+        started_at = block.get("startedAt")
+        ended_at = block.get("endedAt")
+        if started_at is not None and ended_at is not None:
+            try:
+                start_time = parse_iso_datetime(started_at)
+                end_time = parse_iso_datetime(ended_at)
+                durations.append((end_time - start_time).total_seconds() / 3600)
+            except (ValueError, TypeError, AttributeError):
+                continue
+        
+        # Analyze token patterns
+        token_counts = block.get("tokenCounts")
+        if token_counts:
+            total_tokens = token_counts.get("inputTokens", 0) + token_counts.get("outputTokens", 0)
+            if total_tokens > max_tokens:
+                max_tokens = total_tokens
+        
+        # Analyze cost patterns
+        cost = block.get("costUSD")
+        if cost is not None and cost > 0:
+            costs.append(cost)
+    
+    arrays.max_tokens = max_tokens
+    return arrays
+
+
+def _analyze_subscription_patterns(arrays: _BlockArrays) -> Dict[str, Any]:
     """
     Analyze patterns to detect subscription type.
     
     Args:
-        session_durations: List of session durations in hours
-        cost_patterns: List of session costs
-        max_tokens: Maximum tokens seen in a session
+        arrays: Session durations (hours), session costs and max tokens seen
         
     Returns:
         Detection result dictionary
     """
+    session_durations = arrays.durations
+    cost_patterns = arrays.costs
+    
     # Count sessions approaching 5-hour limit (Claude Max pattern)
-    long_sessions = [d for d in session_durations if d > 4.5]  # Close to 5-hour limit
+    long_sessions = sum(1 for d in session_durations if d > 4.5)  # Close to 5-hour limit
     
     # Check for zero-cost sessions (indicates subscription, not pay-per-use)
-    zero_cost_sessions = len([c for c in cost_patterns if c == 0])
-    paid_sessions = len([c for c in cost_patterns if c > 0])
+    zero_cost_sessions = 0
+    paid_sessions = 0
+    for c in cost_patterns:
+        if c == 0:
+            zero_cost_sessions += 1
+        elif c > 0:
+            paid_sessions += 1
     
     # Detection logic
     if zero_cost_sessions > paid_sessions:
         # Subscription model detected
-        if len(long_sessions) > 2:  # Multiple long sessions indicate 5-hour limit
+        if long_sessions > 2:  # Multiple long sessions indicate 5-hour limit
             return {
                 'total_monthly_sessions': 50,
                 'subscription_type': 'claude_max',
@@ -615,9 +867,7 @@ def calculate_total_windows_in_period(period_start: datetime, period_end: dateti
     Returns:
         Total number of 5-hour windows in the period
     """
-    total_duration = period_end - period_start
-    total_hours = total_duration.total_seconds() / 3600
-    return int(total_hours / WINDOW_DURATION_HOURS)
+    return int((period_end.timestamp() - period_start.timestamp()) / _WINDOW_SECONDS)
 
 
 def calculate_remaining_windows(period_start: datetime, period_end: datetime, 
@@ -636,12 +886,11 @@ def calculate_remaining_windows(period_start: datetime, period_end: datetime,
     if current_time is None:
         current_time = datetime.now(UTC_TIMEZONE)
     
-    time_remaining = period_end - current_time
-    if time_remaining.total_seconds() <= 0:
+    seconds_remaining = period_end.timestamp() - current_time.timestamp()
+    if seconds_remaining <= 0:
         return 0
     
-    hours_remaining = time_remaining.total_seconds() / 3600
-    return max(0, int(hours_remaining / WINDOW_DURATION_HOURS))
+    return int(seconds_remaining / _WINDOW_SECONDS)
 
 
 def detect_subscription_plan_from_ccusage(ccusage_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -663,7 +912,7 @@ def detect_subscription_plan_from_ccusage(ccusage_data: Dict[str, Any]) -> Dict[
     if "error" in ccusage_data or not ccusage_data.get("blocks"):
         return {
             'plan_name': 'Pro',
-            'prompts_per_window': SUBSCRIPTION_PLANS['Pro']['default_prompts_per_window'],
+            'prompts_per_window': _PROMPTS_PRO,
             'detection_method': 'default_fallback',
             'confidence': 'low'
         }
@@ -691,7 +940,7 @@ def detect_subscription_plan_from_ccusage(ccusage_data: Dict[str, Any]) -> Dict[
         if session_counts > 150 and avg_cost < 0.5:
             return {
                 'plan_name': 'Max_20x',
-                'prompts_per_window': SUBSCRIPTION_PLANS['Max_20x']['default_prompts_per_window'],
+                'prompts_per_window': _PROMPTS_MAX_20X,
                 'detection_method': 'very_high_volume_minimal_cost',
                 'confidence': 'high'
             }
@@ -699,7 +948,7 @@ def detect_subscription_plan_from_ccusage(ccusage_data: Dict[str, Any]) -> Dict[
         elif session_counts > 40 and avg_cost < 1.5:
             return {
                 'plan_name': 'Max_5x',
-                'prompts_per_window': SUBSCRIPTION_PLANS['Max_5x']['default_prompts_per_window'],
+                'prompts_per_window': _PROMPTS_MAX_5X,
                 'detection_method': 'high_volume_low_cost',
                 'confidence': 'high'
             }
@@ -707,7 +956,7 @@ def detect_subscription_plan_from_ccusage(ccusage_data: Dict[str, Any]) -> Dict[
         elif session_counts > 20 and total_cost > 50 and avg_cost < 3.0:
             return {
                 'plan_name': 'Max_5x',
-                'prompts_per_window': SUBSCRIPTION_PLANS['Max_5x']['default_prompts_per_window'],
+                'prompts_per_window': _PROMPTS_MAX_5X,
                 'detection_method': 'medium_volume_subscription_pattern',
                 'confidence': 'medium'
             }
@@ -715,7 +964,7 @@ def detect_subscription_plan_from_ccusage(ccusage_data: Dict[str, Any]) -> Dict[
         elif max_cost > 8.0 or avg_cost > 5.0:
             return {
                 'plan_name': 'Pro',
-                'prompts_per_window': SUBSCRIPTION_PLANS['Pro']['default_prompts_per_window'],
+                'prompts_per_window': _PROMPTS_PRO,
                 'detection_method': 'high_individual_costs',
                 'confidence': 'medium'
             }
@@ -723,7 +972,7 @@ def detect_subscription_plan_from_ccusage(ccusage_data: Dict[str, Any]) -> Dict[
     # Fallback to Pro plan
     return {
         'plan_name': 'Pro',
-        'prompts_per_window': SUBSCRIPTION_PLANS['Pro']['default_prompts_per_window'],
+        'prompts_per_window': _PROMPTS_PRO,
         'detection_method': 'pattern_analysis_fallback',
         'confidence': 'low'
     }
@@ -767,12 +1016,15 @@ def count_user_prompts_from_ccusage(ccusage_data: Dict[str, Any],
         return 0
     
     user_prompts = 0
-    
+    # Compare POSIX seconds instead of aware datetimes inside the loop
+    window_start_ts = window_start.timestamp()
+    window_end_ts = window_end.timestamp()
+
     for block in ccusage_data["blocks"]:
         try:
             if "startTime" in block:
-                block_start = datetime.fromisoformat(block["startTime"].replace('Z', '+00:00'))
-                if window_start <= block_start <= window_end:
+                block_start = _parse_iso_timestamp(block["startTime"])
+                if window_start_ts <= block_start <= window_end_ts:
                     # Count entries as user prompts (ccusage entries represent user interactions)
                     user_prompts += block.get("entries", 0)
         except (ValueError, TypeError, KeyError):
@@ -781,6 +1033,100 @@ def count_user_prompts_from_ccusage(ccusage_data: Dict[str, Any],
     return user_prompts
 
 
+@dataclass
+class _UsageBlockArrays:
+    """Structure-of-arrays view of ccusage blocks used for usage intensity."""
+    starts: array = field(default_factory=lambda: array('d'))  # POSIX seconds
+    durations: array = field(default_factory=lambda: array('d'))  # Hours
+    is_opus: array = field(default_factory=lambda: array('b'))
+    entries: List[float] = field(default_factory=list)  # List, not array('q'): ccusage may send floats
+    active_session_ids: List[Optional[str]] = field(default_factory=list)  # None once ended
+
+
+def _blocks_to_usage_arrays(blocks: List[Dict[str, Any]]) -> _UsageBlockArrays:
+    """
+    Parse each ccusage block once into parallel arrays for _accumulate_usage.
+    
+    Args:
+        blocks: Blocks from ccusage output
+        
+    Returns:
+        Parsed start times, durations, model flags, entry counts and active session ids
+    """
+    arrays = _UsageBlockArrays()
+    
+    for block in blocks:
+        try:
+            if "startTime" not in block:
+                continue
+            start_ts = _parse_iso_timestamp(block["startTime"])
+            
+            if "endTime" in block:
+                end_ts = _parse_iso_timestamp(block["endTime"])
+                duration_hours = (end_ts - start_ts) / 3600
+                session_id = None
+            else:
+                # Active session - estimate based on typical usage
+                duration_hours = 0.5  # Conservative estimate
+                session_id = block.get("sessionId", f"session_{start_ts}")
+            
+            is_opus = detect_model_from_ccusage_block(block) == 'opus'
+            entries = block.get("entries", 0)
+            
+            # Append only once the whole block parsed, keeping the arrays aligned
+            arrays.entries.append(entries)
+            arrays.starts.append(start_ts)
+            arrays.durations.append(duration_hours)
+            arrays.is_opus.append(is_opus)
+            arrays.active_session_ids.append(session_id)
+        except (ValueError, TypeError, KeyError, OverflowError):
+            continue
+    
+    return arrays
+
+
+def _accumulate_usage(arrays: _UsageBlockArrays,
+                      week_start: float, week_end: float,
+                      window_start: float, window_end: float) -> Tuple[float, float, int, int, set]:
+    """
+    Sum weekly model hours and prompt counts over pre-parsed block arrays.
+    
+    Args:
+        arrays: Parsed block arrays
+        week_start: Start of current week (POSIX seconds)
+        week_end: End of current week (POSIX seconds)
+        window_start: Start of current 5h window (POSIX seconds)
+        window_end: End of current 5h window (POSIX seconds)
+        
+    Returns:
+        Tuple of (sonnet_hours, opus_hours, prompts_week, prompts_window, active_session_ids)
+    """
+    sonnet_hours = 0.0
+    opus_hours = 0.0
+    prompts_week = 0
+    prompts_window = 0
+    active_sessions = set()
+    
+    for start, duration, is_opus, entries, session_id in zip(
+            arrays.starts, arrays.durations, arrays.is_opus,
+            arrays.entries, arrays.active_session_ids):
+        # Count weekly usage
+        if week_start <= start <= week_end:
+            if is_opus:
+                opus_hours += duration
+            else:
+                sonnet_hours += duration
+            prompts_week += entries
+            if session_id is not None:  # Active session
+                active_sessions.add(session_id)
+        
+        # Count prompts in current window
+        if window_start <= start <= window_end:
+            prompts_window += entries
+    
+    return sonnet_hours, opus_hours, prompts_week, prompts_window, active_sessions
+
+
 def calculate_usage_intensity_from_ccusage(ccusage_data: Dict[str, Any], 
                                           week_start: datetime,
                                           week_end: datetime,
@@ -817,57 +1163,12 @@ def calculate_usage_intensity_from_ccusage(ccusage_data: Dict[str, Any],
             'active_sessions': 0
         }
     
-    sonnet_hours = 0.0
-    opus_hours = 0.0
-    user_prompts_week = 0
-    user_prompts_window = 0
-    active_sessions_set = set()
-    
-    for block in ccusage_data["blocks"]:
-        try:
-            # Parse timestamps
-            start_time = None
-            end_time = None
-            
-            if "startTime" in block:
-                start_time = datetime.fromisoformat(block["startTime"].replace('Z', '+00:00'))
-            if "endTime" in block:
-                end_time = datetime.fromisoformat(block["endTime"].replace('Z', '+00:00'))
-            
-            if not start_time:
-                continue
-            
-            # Detect model
-            model = detect_model_from_ccusage_block(block)
-            
-            # Calculate session duration
-            if end_time:
-                duration_hours = (end_time - start_time).total_seconds() / 3600
-            else:
-                # Active session - estimate based on typical usage
-                duration_hours = 0.5  # Conservative estimate
-                
-            # Count weekly usage
-            if week_start <= start_time <= week_end:
-                if model == 'opus':
-                    opus_hours += duration_hours
-                else:
-                    sonnet_hours += duration_hours
-                
-                # Count user prompts for the week
-                user_prompts_week += block.get("entries", 0)
-                
-                # Track active sessions
-                session_id = block.get("sessionId", f"session_{start_time.timestamp()}")
-                if not end_time:  # Active session
-                    active_sessions_set.add(session_id)
-            
-            # Count prompts in current window
-            if window_start <= start_time <= window_end:
-                user_prompts_window += block.get("entries", 0)
-                
-        except (ValueError, TypeError, KeyError) as e:
-            continue
+    sonnet_hours, opus_hours, user_prompts_week, user_prompts_window, active_sessions_set = \
+        _accumulate_usage(
+            _blocks_to_usage_arrays(ccusage_data["blocks"]),
+            week_start.timestamp(), week_end.timestamp(),
+            window_start.timestamp(), window_end.timestamp()
+        )
     
     # Calculate parallel intensity (rough estimation)
     active_sessions = len(active_sessions_set)
@@ -893,6 +1194,17 @@ def calculate_usage_intensity_from_ccusage(ccusage_data: Dict[str, Any],
     }
 
 
+# Sustainability levels by utilization: below bound i -> level i, else the last
+_SUSTAINABILITY_BOUNDS = (0.3, 0.6, SUSTAINABILITY_THRESHOLD, 1.0)
+_SUSTAINABILITY_LEVELS = (
+    ('excellent', 'Excellent - plenty of capacity remaining', True),
+    ('good', 'Good - sustainable pace with room to grow', True),
+    ('moderate', 'Moderate usage - approaching optimal level', True),
+    ('warning', 'Warning - high usage, monitor closely', False),
+    ('critical', 'Critical - usage above recommended limits', False),
+)
+
+
 def calculate_sustainability_status(plan_name: str, usage_metrics: Dict[str, Any]) -> Dict[str, Any]:
     """
     Calculate sustainability status based on current usage vs limits.
@@ -911,8 +1223,6 @@ def calculate_sustainability_status(plan_name: str, usage_metrics: Dict[str, Any
             'can_increase_usage': bool
         }
     """
-    from .constants import SUBSCRIPTION_PLANS, SUSTAINABILITY_THRESHOLD
-    
     if plan_name not in SUBSCRIPTION_PLANS:
         plan_name = 'Pro'  # Fallback
     
@@ -928,26 +1238,9 @@ def calculate_sustainability_status(plan_name: str, usage_metrics: Dict[str, Any
     overall_utilization = max(sonnet_utilization, opus_utilization)
     
     # Determine status
-    if overall_utilization < 0.3:
-        status = 'excellent'
-        message = 'Excellent - plenty of capacity remaining'
-        can_increase = True
-    elif overall_utilization < 0.6:
-        status = 'good'
-        message = 'Good - sustainable pace with room to grow'
-        can_increase = True
-    elif overall_utilization < SUSTAINABILITY_THRESHOLD:
-        status = 'moderate'
-        message = 'Moderate usage - approaching optimal level'
-        can_increase = True
-    elif overall_utilization < 1.0:
-        status = 'warning'
-        message = 'Warning - high usage, monitor closely'
-        can_increase = False
-    else:
-        status = 'critical'
-        message = 'Critical - usage above recommended limits'
-        can_increase = False
+    status, message, can_increase = _SUSTAINABILITY_LEVELS[
+        bisect_right(_SUSTAINABILITY_BOUNDS, overall_utilization)
+    ]
     
     return {
         'status': status,
@@ -959,6 +1252,28 @@ def calculate_sustainability_status(plan_name: str, usage_metrics: Dict[str, Any
     }
 
 
+@lru_cache(maxsize=8)
+def _window_bounds(window_start_epoch: int) -> Tuple[datetime, datetime]:
+    """UTC start/end datetimes of the window starting at a POSIX second."""
+    window_start = datetime.fromtimestamp(window_start_epoch, UTC_TIMEZONE)
+    return window_start, window_start + _WINDOW_DELTA
+
+
+def _window_usage_from_epoch(now: float) -> Dict[str, Any]:
+    """Current-window info for a POSIX time, windows aligned to UTC midnight."""
+    seconds_into_window = now % 86400 % _WINDOW_SECONDS
+    hours_into_window = seconds_into_window / 3600
+    
+    # Bounds only change once per window, so polling reuses the same datetimes
+    window_start, window_end = _window_bounds(int(now - seconds_into_window))
+    return {
+        'window_start': window_start,
+        'window_end': window_end,
+        'hours_into_window': hours_into_window,
+        'progress_percentage': min(100.0, hours_into_window / WINDOW_DURATION_HOURS * 100)
+    }
+
+
 def calculate_current_window_usage(current_time: Optional[datetime] = None) -> Dict[str, Any]:
     """
     Calculate usage within current 5-hour window.
@@ -976,22 +1291,21 @@ def calculate_current_window_usage(current_time: Optional[datetime] = None) -> D
         }
     """
     if current_time is None:
-        current_time = datetime.now(UTC_TIMEZONE)
+        return _window_usage_from_epoch(time.time())
     
-    # Calculate which 5-hour window we're in
-    hours_since_midnight = current_time.hour + current_time.minute / 60.0
-    window_index = int(hours_since_midnight / WINDOW_DURATION_HOURS)
+    # Windows are aligned to midnight; work in whole seconds to find ours
+    seconds_since_midnight = current_time.hour * 3600 + current_time.minute * 60
+    seconds_into_window = seconds_since_midnight % _WINDOW_SECONDS
+    start_hour, start_minute_seconds = divmod(seconds_since_midnight - seconds_into_window, 3600)
     
     # Calculate window boundaries
-    window_start_hour = window_index * WINDOW_DURATION_HOURS
-    window_start = current_time.replace(hour=int(window_start_hour), 
-                                       minute=int((window_start_hour % 1) * 60), 
-                                       second=0, microsecond=0)
-    window_end = window_start + timedelta(hours=WINDOW_DURATION_HOURS)
+    window_start = current_time.replace(hour=start_hour, minute=start_minute_seconds // 60,
+                                        second=0, microsecond=0)
+    window_end = window_start + _WINDOW_DELTA
     
     # Calculate progress within window
-    time_into_window = current_time - window_start
-    hours_into_window = time_into_window.total_seconds() / 3600
+    hours_into_window = (seconds_into_window + current_time.second
+                         + current_time.microsecond / 1_000_000) / 3600
     progress_percentage = (hours_into_window / WINDOW_DURATION_HOURS) * 100
     
     return {
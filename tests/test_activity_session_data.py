@@ -8,14 +8,14 @@ import json
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
+from src.shared.data_models import ActivitySessionData, ActivitySessionStatus, ValidationError
+
 
 class TestActivitySessionData(unittest.TestCase):
     """Test cases for ActivitySessionData model."""
     
     def test_activity_session_data_creation(self):
         """Test basic creation of ActivitySessionData with required fields."""
-        from src.shared.data_models import ActivitySessionData
-        
         # Create activity session data instance
         activity_session = ActivitySessionData(
             project_name="test-project",
@@ -32,8 +32,6 @@ class TestActivitySessionData(unittest.TestCase):
     
     def test_activity_session_data_serialization(self):
         """Test that ActivitySessionData can be serialized to JSON and back."""
-        from src.shared.data_models import ActivitySessionData
-        
         activity_session = ActivitySessionData(
             project_name="test-project-2",
             session_id="claude_session_789",
@@ -63,8 +61,6 @@ class TestActivitySessionData(unittest.TestCase):
     
     def test_activity_session_data_validation(self):
         """Test validation of ActivitySessionData fields."""
-        from src.shared.data_models import ActivitySessionData, ValidationError
-        
         # Valid session should pass validation
         valid_session = ActivitySessionData(
             project_name="valid-project",
@@ -96,8 +92,6 @@ class TestActivitySessionData(unittest.TestCase):
     
     def test_activity_session_status_enum(self):
         """Test that ActivitySessionData uses valid status values."""
-        from src.shared.data_models import ActivitySessionData, ActivitySessionStatus
-        
         # Test enum values
         self.assertEqual(ActivitySessionStatus.ACTIVE.value, "ACTIVE")
         self.assertEqual(ActivitySessionStatus.WAITING_FOR_USER.value, "WAITING_FOR_USER")
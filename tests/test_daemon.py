@@ -42,6 +42,15 @@ class TestClaudeDaemon(unittest.TestCase):
         import shutil
         shutil.rmtree(self.temp_dir, ignore_errors=True)
 
+    def _wait_for(self, condition, timeout=2.0):
+        """Poll condition until it holds or timeout expires, instead of a fixed sleep."""
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
     def test_daemon_initialization(self):
         """Test basic daemon initialization."""
         daemon = ClaudeDaemon(self.test_config)
@@ -97,23 +106,29 @@ class TestClaudeDaemon(unittest.TestCase):
         # Use short intervals for testing
         test_config = ConfigData(
             refresh_interval_seconds=0.1,
-            ccusage_fetch_interval_seconds=0.2
+            ccusage_fetch_interval_seconds=0.5
         )
+        loop_tick_seconds = 0.1  # The main loop re-checks the schedule this often
         
         daemon = ClaudeDaemon(test_config)
         
-        # Mock the data collection to track calls
-        daemon._collect_data = Mock()
+        # Mock the data collection to track when each call happens
+        call_times = []
+        daemon._collect_data = Mock(side_effect=lambda: call_times.append(time.monotonic()))
         
         daemon.start()
+        self.addCleanup(daemon.stop)
         
-        # Let it run for a short time
-        time.sleep(0.3)
+        # The first collection is immediate, so wait for a second one
+        collected_twice = self._wait_for(lambda: daemon._collect_data.call_count >= 2)
         
         daemon.stop()
         
-        # Verify data collection was called
-        self.assertGreater(daemon._collect_data.call_count, 0)
+        # Verify the second collection waited for the fetch interval, not the
+        # next loop tick; the allowance is one tick, well clear of scheduling noise
+        self.assertTrue(collected_twice)
+        self.assertGreaterEqual(call_times[1] - call_times[0],
+                                test_config.ccusage_fetch_interval_seconds - loop_tick_seconds)
 
     def test_daemon_double_start_prevention(self):
         """Test that daemon prevents double start."""
@@ -160,9 +175,11 @@ class TestClaudeDaemon(unittest.TestCase):
         daemon._collect_data = Mock(side_effect=Exception("Test error"))
         
         daemon.start()
+        self.addCleanup(daemon.stop)
         
-        # Let it run despite errors
-        time.sleep(0.2)
+        # Let it run until it has collected again after the first error
+        # (the loop backs off for a second after an exception)
+        self.assertTrue(self._wait_for(lambda: daemon._collect_data.call_count >= 2, timeout=3.0))
         
         # Daemon should still be running
         self.assertTrue(daemon.is_running)
@@ -227,8 +244,8 @@ class TestClaudeDaemon(unittest.TestCase):
         
         daemon.start()
         
-        # Let daemon run for a brief time
-        time.sleep(0.3)
+        # Wait until the first collection has been written
+        self._wait_for(lambda: daemon.file_manager.write_monitoring_data.call_count > 0)
         
         daemon.stop()
         
@@ -271,8 +288,9 @@ class TestClaudeDaemon(unittest.TestCase):
         
         daemon.start()
         
-        # Let it run for sufficient time to trigger cleanup calls
-        time.sleep(0.5)
+        # Wait until the loop has triggered cleanup
+        self._wait_for(
+            lambda: daemon.session_activity_tracker.cleanup_completed_billing_sessions.call_count > 0)
         
         daemon.stop()
         
@@ -9,9 +9,25 @@ from datetime import datetime, date, timedelta
 from zoneinfo import ZoneInfo
 
 
+class _FixedMinuteClock:
+    """Stand-in for utils' datetime whose now() only needs a minute."""
+
+    def __init__(self, minute):
+        self.minute = minute
+
+    def now(self, tz=None):
+        return self
+
+
 class TestUtils(unittest.TestCase):
     """Test cases for utility functions."""
     
+    def setUp(self):
+        """Start each test with an empty command lookup cache."""
+        from src.shared.utils import _which
+        _which.cache_clear()
+        self.addCleanup(_which.cache_clear)
+    
     def test_get_subscription_period_start(self):
         """Test subscription period start calculation."""
         from src.shared.utils import get_subscription_period_start
@@ -39,6 +55,25 @@ class TestUtils(unittest.TestCase):
         test_date = date(2024, 1, 10)  # 10th of January
         next_date = get_next_renewal_date(15, test_date)
         self.assertEqual(next_date, date(2024, 1, 15))
+        
+        # Test case 3: Billing day past the end of the renewal month clamps
+        self.assertEqual(get_next_renewal_date(31, date(2024, 1, 31)), date(2024, 2, 29))
+        self.assertEqual(get_next_renewal_date(31, date(2023, 12, 31)), date(2024, 1, 31))
+    
+    def test_billing_period_contains_clamped_renewal_day(self):
+        """Test the period start and next renewal agree on month-end renewal days."""
+        from src.shared.utils import get_subscription_period_start, get_next_renewal_date
+        
+        for reference in (date(2024, 4, 30), date(2024, 2, 29), date(2023, 2, 28), date(2024, 5, 1)):
+            start = get_subscription_period_start(31, reference)
+            renewal = get_next_renewal_date(31, reference)
+            self.assertLessEqual(start, reference, reference)
+            self.assertLess(reference, renewal, reference)
+        
+        self.assertEqual(get_subscription_period_start(31, date(2024, 4, 30)), date(2024, 4, 30))
+        self.assertEqual(get_next_renewal_date(31, date(2024, 4, 30)), date(2024, 5, 31))
+        self.assertEqual(get_subscription_period_start(31, date(2024, 2, 29)), date(2024, 2, 29))
+        self.assertEqual(get_next_renewal_date(31, date(2024, 2, 29)), date(2024, 3, 31))
     
     def test_create_progress_bar(self):
         """Test progress bar creation."""
@@ -63,6 +98,14 @@ class TestUtils(unittest.TestCase):
         # Test negative (should clamp)
         bar = create_progress_bar(-10, 10)
         self.assertEqual(bar, "[          ]")
+        
+        # NaN renders a full bar, a negative width an empty one
+        self.assertEqual(create_progress_bar(float("nan"), 10), "[██████████]")
+        self.assertEqual(create_progress_bar(50, -3), "[]")
+        
+        # Test width beyond the pre-built pool
+        with self.assertRaises(ValueError):
+            create_progress_bar(50, 1000)
     
     def test_format_timedelta(self):
         """Test timedelta formatting."""
@@ -85,6 +128,7 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(format_currency(0.99, "USD"), "$0.99")
         self.assertEqual(format_currency(10.5, "EUR"), "10.50 EUR")
         self.assertEqual(format_currency(100.0), "$100.00")
+        self.assertEqual(format_currency(1.0, "usd"), "$1.00")
     
     def test_format_token_count(self):
         """Test token count formatting."""
@@ -94,6 +138,8 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(format_token_count(25000), "25,000")
         self.assertEqual(format_token_count(1500000), "1,500,000")
         self.assertEqual(format_token_count(999), "999")
+        self.assertEqual(format_token_count(0), "0")
+        self.assertEqual(format_token_count(-1500), "-1,500")
     
     def test_validate_timezone(self):
         """Test timezone validation."""
@@ -132,6 +178,81 @@ class TestUtils(unittest.TestCase):
         # This command should not exist
         self.assertFalse(is_command_available("definitely_not_a_real_command_12345"))
     
+    def test_run_ccusage_command_caches_successful_results(self):
+        """Test that ccusage output is reused within the cache TTL."""
+        from src.shared import utils
+        from unittest.mock import patch, MagicMock
+        
+        utils._ccusage_cache.clear()
+        self.addCleanup(utils._ccusage_cache.clear)
+        
+        completed = MagicMock(stdout='{"blocks": [{"id": 1}]}')
+        with patch('src.shared.utils.subprocess.run', return_value=completed) as mock_run:
+            first = utils.run_ccusage_command()
+            second = utils.run_ccusage_command()
+            utils.run_ccusage_command("20240101")
+        
+        self.assertEqual(first, {"blocks": [{"id": 1}]})
+        self.assertEqual(first, second)
+        self.assertEqual(mock_run.call_count, 2)  # One per distinct since_date
+        
+        # A caller mutating its result must not change what others get
+        first["blocks"].clear()
+        first["error"] = "changed"
+        with patch('src.shared.utils.subprocess.run', return_value=completed):
+            self.assertEqual(utils.run_ccusage_command(), {"blocks": [{"id": 1}]})
+        
+        # Errors must not be cached
+        utils._ccusage_cache.clear()
+        with patch('src.shared.utils.subprocess.run', side_effect=FileNotFoundError) as mock_run:
+            utils.run_ccusage_command()
+            utils.run_ccusage_command()
+        self.assertEqual(mock_run.call_count, 2)
+    
+    def test_send_macos_notification_osascript_passes_text_as_arguments(self):
+        """Test osascript fallback never splices user text into the script."""
+        import subprocess
+        from src.shared.utils import send_macos_notification
+        from unittest.mock import patch
+        
+        available = {"terminal-notifier": False, "osascript": True}
+        with patch('src.shared.utils.is_macos', return_value=True), \
+                patch('src.shared.utils.is_command_available', side_effect=available.get), \
+                patch('src.shared.utils.subprocess.run') as mock_run:
+            result = send_macos_notification('Say "hi"', 'Done "now"', "Glass")
+        
+        self.assertTrue(result)
+        cmd = mock_run.call_args.args[0]
+        self.assertEqual(os.path.basename(cmd[0]), "osascript")
+        self.assertEqual(cmd[-3:], ['Done "now"', 'Say "hi"', "Glass"])
+        script = " ".join(cmd[1:-3])
+        self.assertNotIn("hi", script)
+        self.assertNotIn("now", script)
+        self.assertEqual(mock_run.call_args.kwargs["stdout"], subprocess.DEVNULL)
+    
+    def test_clear_terminal(self):
+        """Test terminal clearing writes ANSI sequence instead of spawning a shell."""
+        from src.shared.utils import clear_terminal
+        from unittest.mock import patch
+        import io
+        
+        with patch('src.shared.utils._ANSI_SUPPORTED', True), \
+                patch('sys.stdout', new_callable=io.StringIO) as mock_stdout, \
+                patch('os.system') as mock_system:
+            clear_terminal()
+        
+        self.assertEqual(mock_stdout.getvalue(), "\033[2J\033[H")
+        mock_system.assert_not_called()
+        
+        # Terminals without ANSI support fall back to the system command
+        with patch('src.shared.utils._ANSI_SUPPORTED', False), \
+                patch('sys.stdout', new_callable=io.StringIO) as mock_stdout, \
+                patch('os.system') as mock_system:
+            clear_terminal()
+        
+        self.assertEqual(mock_stdout.getvalue(), "")
+        mock_system.assert_called_once()
+    
     def test_truncate_string(self):
         """Test string truncation."""
         from src.shared.utils import truncate_string
@@ -167,6 +288,7 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(calculate_percentage(150, 100), 100.0)  # Clamped
         self.assertEqual(calculate_percentage(10, 0), 0.0)  # Edge case
         self.assertEqual(calculate_percentage(-10, 100), 0.0)  # Clamped
+        self.assertEqual(calculate_percentage(float("nan"), 100), 100.0)  # NaN clamps high
     
     def test_parse_date_string(self):
         """Test date string parsing."""
@@ -184,6 +306,17 @@ class TestUtils(unittest.TestCase):
         result = parse_date_string("15/01/2024", "%d/%m/%Y")
         self.assertEqual(result, date(2024, 1, 15))
     
+    def test_parse_iso_datetime(self):
+        """Test ISO 8601 parsing with a trailing 'Z'."""
+        from src.shared.utils import parse_iso_datetime
+        
+        parsed = parse_iso_datetime("2025-06-18T08:00:00.000Z")
+        self.assertEqual(parsed, datetime(2025, 6, 18, 8, 0, tzinfo=ZoneInfo("UTC")))
+        self.assertEqual(parsed.utcoffset(), timedelta(0))
+        
+        with self.assertRaises(ValueError):
+            parse_iso_datetime("not a date")
+    
     def test_format_file_size(self):
         """Test file size formatting."""
         from src.shared.utils import format_file_size
@@ -245,64 +378,212 @@ class TestUtils(unittest.TestCase):
         finally:
             os.unlink(temp_path)
     
+    def test_detect_subscription_limits(self):
+        """Test subscription detection from ccusage block patterns."""
+        from src.shared.utils import detect_subscription_limits, _blocks_to_arrays
+        from unittest.mock import patch
+        
+        blocks = [
+            {
+                "startedAt": "2024-01-15T10:00:00Z",
+                "endedAt": "2024-01-15T14:48:00Z",
+                "costUSD": 2.5,
+                "tokenCounts": {"inputTokens": 1000, "outputTokens": 500}
+            },
+            {"costUSD": 0, "tokenCounts": {"inputTokens": 3000, "outputTokens": 0}},
+        ]
+        
+        arrays = _blocks_to_arrays(blocks)
+        self.assertEqual(list(arrays.durations), [4.8])
+        self.assertEqual(list(arrays.costs), [2.5])  # Only paid sessions are collected
+        self.assertEqual(arrays.max_tokens, 3000)
+        
+        with patch('src.shared.utils.run_ccusage_command', return_value={"blocks": blocks}):
+            result = detect_subscription_limits()
+        self.assertEqual(result['subscription_type'], 'pay_per_use')
+        
+        with patch('src.shared.utils.run_ccusage_command', return_value={"error": "x", "blocks": []}):
+            result = detect_subscription_limits()
+        self.assertEqual(result['detection_method'], 'default_fallback')
+    
+    def test_calculate_usage_intensity_from_ccusage(self):
+        """Test weekly hours and prompt counts from ccusage blocks."""
+        from src.shared.utils import calculate_usage_intensity_from_ccusage
+        
+        utc = ZoneInfo("UTC")
+        week_start = datetime(2024, 1, 8, tzinfo=utc)
+        week_end = datetime(2024, 1, 15, tzinfo=utc)
+        window_start = datetime(2024, 1, 10, 10, tzinfo=utc)
+        window_end = datetime(2024, 1, 10, 15, tzinfo=utc)
+        
+        ccusage_data = {"blocks": [
+            {"startTime": "2024-01-09T10:00:00Z", "endTime": "2024-01-09T12:00:00Z",
+             "entries": 5, "modelId": "claude-sonnet-4"},
+            {"startTime": "2024-01-10T11:00:00Z", "endTime": "2024-01-10T12:30:00Z",
+             "entries": 3.0, "modelId": "claude-opus-4"},  # Float counts still count
+            {"startTime": "2024-01-10T12:00:00Z", "entries": 2, "sessionId": "live"},
+            {"startTime": "2024-01-01T10:00:00Z", "endTime": "2024-01-01T11:00:00Z",
+             "entries": 7},  # Outside the week
+            {"startTime": "not-a-date", "entries": 100},
+        ]}
+        
+        result = calculate_usage_intensity_from_ccusage(
+            ccusage_data, week_start, week_end, window_start, window_end
+        )
+        
+        self.assertAlmostEqual(result['sonnet_hours_week'], 2.5)  # 2h + 0.5h active estimate
+        self.assertAlmostEqual(result['opus_hours_week'], 1.5)
+        self.assertEqual(result['user_prompts_week'], 10)
+        self.assertEqual(result['user_prompts_window'], 5)
+        self.assertEqual(result['active_sessions'], 1)
+        self.assertEqual(result['parallel_intensity'], 1.0)
+    
+    def test_calculate_sustainability_status(self):
+        """Test status levels at and around each utilization boundary."""
+        from src.shared.utils import calculate_sustainability_status
+        
+        # Pro plan: sonnet_weekly_avg = 60 hours, no Opus
+        cases = [(0, 'excellent'), (17.9, 'excellent'), (18, 'good'), (36, 'moderate'),
+                 (48, 'warning'), (59.9, 'warning'), (60, 'critical'), (600, 'critical')]
+        for sonnet_hours, expected in cases:
+            result = calculate_sustainability_status(
+                'Pro', {'sonnet_hours_week': sonnet_hours, 'opus_hours_week': 0})
+            self.assertEqual(result['status'], expected, sonnet_hours)
+            self.assertEqual(result['can_increase_usage'], expected in ('excellent', 'good', 'moderate'))
+        
+        # Unknown plans fall back to Pro
+        result = calculate_sustainability_status('Unknown', {'sonnet_hours_week': 60, 'opus_hours_week': 0})
+        self.assertEqual(result['status'], 'critical')
+    
+    def test_calculate_windows_in_period(self):
+        """Test total and remaining 5-hour window counts."""
+        from src.shared.utils import calculate_total_windows_in_period, calculate_remaining_windows
+        
+        utc = ZoneInfo("UTC")
+        period_start = datetime(2024, 1, 1, tzinfo=utc)
+        period_end = datetime(2024, 1, 31, tzinfo=utc)
+        
+        # 30 days * 24h / 5h = 144 windows
+        self.assertEqual(calculate_total_windows_in_period(period_start, period_end), 144)
+        
+        # 12h left -> 2 full windows
+        current_time = datetime(2024, 1, 30, 12, tzinfo=utc)
+        self.assertEqual(calculate_remaining_windows(period_start, period_end, current_time), 2)
+        
+        # Past the end of the period
+        current_time = datetime(2024, 2, 2, tzinfo=utc)
+        self.assertEqual(calculate_remaining_windows(period_start, period_end, current_time), 0)
+    
+    def test_calculate_current_window_usage(self):
+        """Test current 5-hour window boundaries and progress."""
+        from src.shared.utils import calculate_current_window_usage
+        
+        current_time = datetime(2024, 1, 15, 12, 30, 0, tzinfo=ZoneInfo("UTC"))
+        window = calculate_current_window_usage(current_time)
+        
+        self.assertEqual(window['window_start'], datetime(2024, 1, 15, 10, 0, tzinfo=ZoneInfo("UTC")))
+        self.assertEqual(window['window_end'], datetime(2024, 1, 15, 15, 0, tzinfo=ZoneInfo("UTC")))
+        self.assertAlmostEqual(window['hours_into_window'], 2.5)
+        self.assertAlmostEqual(window['progress_percentage'], 50.0)
+        
+        # Last window of the day crosses midnight
+        late_time = datetime(2024, 1, 15, 22, 0, 0, tzinfo=ZoneInfo("UTC"))
+        window = calculate_current_window_usage(late_time)
+        self.assertEqual(window['window_start'], datetime(2024, 1, 15, 20, 0, tzinfo=ZoneInfo("UTC")))
+        self.assertEqual(window['window_end'], datetime(2024, 1, 16, 1, 0, tzinfo=ZoneInfo("UTC")))
+        
+        # Default "now" path works in POSIX seconds and must agree
+        from unittest.mock import patch
+        with patch('src.shared.utils.time.time', return_value=current_time.timestamp()):
+            self.assertEqual(calculate_current_window_usage(), calculate_current_window_usage(current_time))
+        
+        # Polls within one window share the cached boundary datetimes
+        with patch('src.shared.utils.time.time', side_effect=[current_time.timestamp(), current_time.timestamp() + 60]):
+            first = calculate_current_window_usage()
+            second = calculate_current_window_usage()
+        self.assertIs(first['window_start'], second['window_start'])
+        self.assertGreater(second['hours_into_window'], first['hours_into_window'])
+
+    def test_count_user_prompts_from_ccusage(self):
+        """Test counting prompts from blocks inside a window (inclusive bounds)."""
+        from src.shared.utils import count_user_prompts_from_ccusage
+
+        window_start = datetime(2024, 1, 15, 10, 0, tzinfo=ZoneInfo("UTC"))
+        window_end = datetime(2024, 1, 15, 15, 0, tzinfo=ZoneInfo("UTC"))
+        ccusage_data = {"blocks": [
+            {"startTime": "2024-01-15T10:00:00Z", "entries": 3},
+            {"startTime": "2024-01-15T12:00:00.500Z", "entries": 4},
+            {"startTime": "2024-01-15T15:00:00Z", "entries": 5},
+            {"startTime": "2024-01-15T15:00:00.001Z", "entries": 100},
+            {"startTime": "2024-01-15T09:59:59Z", "entries": 100},
+            {"startTime": "not a date", "entries": 100},
+            {"entries": 100},
+        ]}
+
+        self.assertEqual(count_user_prompts_from_ccusage(ccusage_data, window_start, window_end), 12)
+        self.assertEqual(count_user_prompts_from_ccusage({"error": "x"}, window_start, window_end), 0)
+    
     def test_get_work_timing_suggestion(self):
         """Test work timing suggestions based on current minute."""
         from src.shared.utils import get_work_timing_suggestion
+        from src.shared.constants import (
+            TIMING_SUGGESTIONS_POSITIVE, TIMING_SUGGESTIONS_MODERATE,
+            TIMING_SUGGESTIONS_SKEPTICAL, TIMING_SUGGESTIONS_CRITICAL
+        )
         from unittest.mock import patch
         
         # Test 0-15 minutes: positive suggestions
-        with patch('src.shared.utils.datetime') as mock_datetime:
-            mock_datetime.now.return_value.minute = 5
+        with patch('src.shared.utils.datetime', _FixedMinuteClock(5)):
             suggestion = get_work_timing_suggestion()
             self.assertIsInstance(suggestion, str)
             self.assertGreater(len(suggestion), 0)
             # Should be from positive suggestions list
+            self.assertIn(suggestion, TIMING_SUGGESTIONS_POSITIVE)
             
         # Test 16-30 minutes: moderately positive suggestions
-        with patch('src.shared.utils.datetime') as mock_datetime:
-            mock_datetime.now.return_value.minute = 25
+        with patch('src.shared.utils.datetime', _FixedMinuteClock(25)):
             suggestion = get_work_timing_suggestion()
             self.assertIsInstance(suggestion, str)
             self.assertGreater(len(suggestion), 0)
+            self.assertIn(suggestion, TIMING_SUGGESTIONS_MODERATE)
             
         # Test 31-45 minutes: skeptical suggestions
-        with patch('src.shared.utils.datetime') as mock_datetime:
-            mock_datetime.now.return_value.minute = 35
+        with patch('src.shared.utils.datetime', _FixedMinuteClock(35)):
             suggestion = get_work_timing_suggestion()
             self.assertIsInstance(suggestion, str)
             self.assertGreater(len(suggestion), 0)
+            self.assertIn(suggestion, TIMING_SUGGESTIONS_SKEPTICAL)
             
         # Test 46-59 minutes: humorous/critical suggestions
-        with patch('src.shared.utils.datetime') as mock_datetime:
-            mock_datetime.now.return_value.minute = 55
+        with patch('src.shared.utils.datetime', _FixedMinuteClock(55)):
             suggestion = get_work_timing_suggestion()
             self.assertIsInstance(suggestion, str)
             self.assertGreater(len(suggestion), 0)
+            self.assertIn(suggestion, TIMING_SUGGESTIONS_CRITICAL)
             
         # Test edge cases
-        with patch('src.shared.utils.datetime') as mock_datetime:
-            mock_datetime.now.return_value.minute = 0
+        with patch('src.shared.utils.datetime', _FixedMinuteClock(0)):
             suggestion = get_work_timing_suggestion()
             self.assertIsInstance(suggestion, str)
+            self.assertIn(suggestion, TIMING_SUGGESTIONS_POSITIVE)
             
-        with patch('src.shared.utils.datetime') as mock_datetime:
-            mock_datetime.now.return_value.minute = 15
+        with patch('src.shared.utils.datetime', _FixedMinuteClock(15)):
             suggestion = get_work_timing_suggestion()
             self.assertIsInstance(suggestion, str)
+            self.assertIn(suggestion, TIMING_SUGGESTIONS_POSITIVE)
             
-        with patch('src.shared.utils.datetime') as mock_datetime:
-            mock_datetime.now.return_value.minute = 30
+        with patch('src.shared.utils.datetime', _FixedMinuteClock(30)):
             suggestion = get_work_timing_suggestion()
             self.assertIsInstance(suggestion, str)
+            self.assertIn(suggestion, TIMING_SUGGESTIONS_MODERATE)
             
-        with patch('src.shared.utils.datetime') as mock_datetime:
-            mock_datetime.now.return_value.minute = 45
+        with patch('src.shared.utils.datetime', _FixedMinuteClock(45)):
             suggestion = get_work_timing_suggestion()
             self.assertIsInstance(suggestion, str)
+            self.assertIn(suggestion, TIMING_SUGGESTIONS_SKEPTICAL)
             
         # Test randomization - call multiple times and ensure we get different results
-        with patch('src.shared.utils.datetime') as mock_datetime:
-            mock_datetime.now.return_value.minute = 10
+        with patch('src.shared.utils.datetime', _FixedMinuteClock(10)):
             suggestions = set()
             for _ in range(10):  # Call 10 times
                 suggestions.add(get_work_timing_suggestion())